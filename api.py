@@ -2,19 +2,53 @@
 # IMPORTS
 # -----------------------------------------------------------
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
-import PyPDF2
+from pdf_utils import (
+    close_resources,
+    get_tokenizer,
+    open_resources,
+    read_pdf_from_file,
+    summarize_long_text,
+    warm_up_model,
+)
+import asyncio
 import tempfile
-import requests
+import httpx
 import os
 
+# -----------------------------------------------------------
+# STARTUP / SHUTDOWN
+# -----------------------------------------------------------
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared HTTP client and page extraction pool, then wake the hosted model and
+    load the tokenizer in the background so the first real request doesn't wait for either.
+    On shutdown, stop the background tasks before closing what they use.
+    """
+    open_resources()
+    background = [
+        asyncio.create_task(warm_up_model()),
+        asyncio.create_task(asyncio.to_thread(get_tokenizer)),
+    ]
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await close_resources()
+
 # -----------------------------------------------------------
 # INITIALIZE FASTAPI
 # -----------------------------------------------------------
 
-app = FastAPI(title="PDF Summarizer API")
+app = FastAPI(title="PDF Summarizer API", lifespan=lifespan)
 
 # Enable CORS so frontend can access API
 app.add_middleware(
@@ -25,68 +59,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses; extracted PDF text can be several MB
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # -----------------------------------------------------------
-# HUGGING FACE INFERENCE API CONFIG
+# API ENDPOINTS
 # -----------------------------------------------------------
 
-HF_API_TOKEN = os.getenv("HUGGINGFACE_API_TOKEN")  # Set your token in environment
-HF_API_URL = "https://api-inference.huggingface.co/models/sshleifer/distilbart-cnn-12-6"
-HEADERS = {"Authorization": f"Bearer {HF_API_TOKEN}"}
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MB per read when streaming uploads to disk
 
 
-def hf_summarize(text: str) -> str:
-    """Send text to Hugging Face Inference API and get the summary."""
-    payload = {"inputs": text}
+async def extract_upload_text(file: UploadFile) -> str:
+    """Stream an uploaded PDF to a temp file and extract its text."""
+    tmp_path = None
     try:
-        response = requests.post(HF_API_URL, headers=HEADERS, json=payload, timeout=60)
-        response.raise_for_status()
-        data = response.json()
-        if isinstance(data, list) and "summary_text" in data[0]:
-            return data[0]["summary_text"]
-        return str(data)
-    except requests.RequestException as e:
-        return f"Error calling Hugging Face API: {str(e)}"
-
-# -----------------------------------------------------------
-# HELPER FUNCTIONS
-# -----------------------------------------------------------
-
-def read_pdf_from_file(file_path: str) -> str:
-    """Extract all text from a PDF file."""
-    reader = PyPDF2.PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+        # Stream the upload to disk so large PDFs are never fully buffered in memory
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            tmp_path = tmp.name
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                tmp.write(chunk)
 
+        # Extraction is blocking; run it off the event loop
+        return await asyncio.to_thread(read_pdf_from_file, tmp_path)
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
 
-def chunk_text(text: str, max_length: int = 1000, overlap: int = 100):
-    """
-    Split text into overlapping chunks.
-    - max_length: approx number of characters per chunk
-    - overlap: number of characters overlapping between chunks
-    """
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + max_length
-        chunks.append(text[start:end])
-        start += max_length - overlap
-    return chunks
-
-
-def summarize_long_text(text: str) -> str:
-    """Summarize long text in chunks via Hugging Face API."""
-    chunks = chunk_text(text, max_length=1000, overlap=100)
-    summaries = []
-    for chunk in chunks:
-        summary = hf_summarize(chunk)
-        summaries.append(summary)
-    return " ".join(summaries)
-
-# -----------------------------------------------------------
-# API ENDPOINTS
-# -----------------------------------------------------------
 
 @app.get("/")
 def root():
@@ -98,16 +96,29 @@ def root():
 async def read_pdf_api(file: UploadFile = File(...)):
     """Extract text from uploaded PDF."""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
-
-        text = read_pdf_from_file(tmp_path)
+        text = await extract_upload_text(file)
         return JSONResponse({"text": text})
     except Exception as e:
         return JSONResponse({"error": f"Failed to read PDF: {str(e)}"}, status_code=500)
 
 
+@app.post("/summarize-pdf")
+async def summarize_pdf_api(file: UploadFile = File(...)):
+    """Extract text from uploaded PDF and summarize it, without sending the text back to the client."""
+    try:
+        text = await extract_upload_text(file)
+    except Exception as e:
+        return JSONResponse({"error": f"Failed to read PDF: {str(e)}"}, status_code=500)
+    if not text.strip():
+        return JSONResponse({"error": "No text found in PDF"}, status_code=400)
+
+    try:
+        summary = await summarize_long_text(text)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Error calling Hugging Face API: {str(e)}"}, status_code=502)
+    return JSONResponse({"summary": summary})
+
+
 @app.post("/summarize")
 async def summarize_api(data: dict):
     """Summarize text using Hugging Face API."""
@@ -115,7 +126,10 @@ async def summarize_api(data: dict):
     if not text:
         return JSONResponse({"error": "No text provided"}, status_code=400)
 
-    summary = summarize_long_text(text)
+    try:
+        summary = await summarize_long_text(text)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Error calling Hugging Face API: {str(e)}"}, status_code=502)
     return JSONResponse({"summary": summary})
 
 
@@ -126,5 +140,8 @@ async def humanize_api(data: dict):
     if not text:
         return JSONResponse({"error": "No text provided"}, status_code=400)
 
-    humanized = summarize_long_text(text)
+    try:
+        humanized = await summarize_long_text(text)
+    except httpx.HTTPError as e:
+        return JSONResponse({"error": f"Error calling Hugging Face API: {str(e)}"}, status_code=502)
     return JSONResponse({"humanized": humanized})
@@ -0,0 +1,43 @@
+import pytest
+
+
+def write_pdf(path, page_texts):
+    """Write a minimal PDF with one line of Helvetica text per page (empty string: blank page)."""
+    n = len(page_texts)
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[" + b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(n)) + b"]/Count %d>>" % n,
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+    ]
+    for i, text in enumerate(page_texts):
+        content = b"BT /F1 12 Tf 20 100 Td (%s) Tj ET" % text.encode("latin-1") if text else b""
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 600 200]"
+            b"/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>" % (5 + 2 * i)
+        )
+        objects.append(b"<</Length %d>>stream\n%s\nendstream" % (len(content), content))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """make_pdf(page_texts) -> path of a new PDF with those pages."""
+    count = 0
+
+    def make(page_texts):
+        nonlocal count
+        count += 1
+        return write_pdf(tmp_path / f"doc{count}.pdf", page_texts)
+
+    return make
@@ -0,0 +1,468 @@
+# -----------------------------------------------------------
+# PDF / SUMMARIZATION UTILITIES
+# Shared by the API endpoints; imported once per process.
+# -----------------------------------------------------------
+
+# -----------------------------------------------------------
+# IMPORTS
+# -----------------------------------------------------------
+
+import pypdfium2 as pdfium
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from bisect import bisect_left
+from itertools import repeat
+from cachetools import LRUCache
+from typing import Optional
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import re
+import threading
+import time
+import httpx
+import os
+
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------
+# HUGGING FACE INFERENCE API CONFIG
+# -----------------------------------------------------------
+
+HF_API_TOKEN = os.getenv("HUGGINGFACE_API_TOKEN")  # Set your token in environment
+HF_MODEL = "sshleifer/distilbart-cnn-12-6"
+HF_API_URL = f"https://api-inference.huggingface.co/models/{HF_MODEL}"
+HEADERS = {"Authorization": f"Bearer {HF_API_TOKEN}"}
+
+
+HF_CONCURRENCY_LIMIT = 4  # Max chunk requests in flight, to stay under HF rate limits
+HF_BATCH_SIZE = 8  # Max chunks per batched request
+HF_RETRIES = 3  # Retries while the model is loading (HTTP 503)
+HF_RETRY_BACKOFF = 0.5  # Seconds; doubled on each retry
+HF_BATCH_REJECTED = (400, 413)  # Statuses meaning the batch itself was refused (e.g. too large)
+
+# Shared HTTP/2 client (concurrent chunk requests are multiplexed over one connection)
+# and its request limiter. Both are created by open_resources(), not at import, so
+# process pool workers importing this module stay cheap and every startup starts fresh.
+client = None
+hf_semaphore = None
+
+# Successful summaries keyed by chunk hash, so repeated text is not re-summarized
+summary_cache = LRUCache(maxsize=4096)
+
+
+def chunk_key(chunk: str) -> str:
+    """Cache key for a chunk of text."""
+    return hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+
+
+async def hf_post(payload: dict, **kwargs) -> httpx.Response:
+    """POST to Hugging Face Inference API, retrying with backoff on 503 (model loading)."""
+    for attempt in range(HF_RETRIES + 1):
+        async with hf_semaphore:
+            response = await client.post(HF_API_URL, json=payload, **kwargs)
+        if response.status_code != 503 or attempt == HF_RETRIES:
+            return response
+        await asyncio.sleep(HF_RETRY_BACKOFF * 2 ** attempt)
+
+
+async def hf_summarize(text: str) -> str:
+    """
+    Send text to Hugging Face Inference API and get the summary.
+    Raises httpx.HTTPError on a failed request or an unexpected response,
+    the same way hf_summarize_batch does.
+    """
+    payload = {"inputs": text}
+    response = await hf_post(payload)
+    response.raise_for_status()
+    try:
+        data = response.json()
+    except ValueError as e:  # Response body is not JSON
+        raise httpx.DecodingError(f"Invalid JSON from Hugging Face API: {e}", request=response.request)
+    if not (isinstance(data, list) and data and isinstance(data[0], dict) and "summary_text" in data[0]):
+        raise httpx.DecodingError(f"Unexpected response from Hugging Face API: {data!r}", request=response.request)
+    summary_cache[chunk_key(text)] = data[0]["summary_text"]
+    return data[0]["summary_text"]
+
+
+async def hf_summarize_batch(chunks: list) -> Optional[list]:
+    """
+    Send all chunks to Hugging Face Inference API in a single request.
+    Returns one summary per chunk, or None if the API rejects the batch
+    (HF_BATCH_REJECTED status or an unexpected response shape).
+    Any other failure raises httpx.HTTPError.
+    """
+    payload = {"inputs": chunks, "options": {"wait_for_model": True}}
+    response = await hf_post(payload, timeout=120)
+    if response.status_code in HF_BATCH_REJECTED:
+        return None
+    response.raise_for_status()
+    try:
+        data = response.json()
+    except ValueError:  # Response body is not JSON
+        return None
+    if (
+        isinstance(data, list)
+        and len(data) == len(chunks)
+        and all(isinstance(d, dict) and "summary_text" in d for d in data)
+    ):
+        summaries = [d["summary_text"] for d in data]
+        for chunk, summary in zip(chunks, summaries):
+            summary_cache[chunk_key(chunk)] = summary
+        return summaries
+    return None
+
+
+async def warm_up_model():
+    """Send a tiny request so the hosted model is loaded before real traffic arrives."""
+    try:
+        await hf_summarize_batch(["warmup text"])
+    except httpx.HTTPError as e:
+        logger.warning("Model warm-up failed: %s", e)
+
+
+async def summarize_batch(chunks: list) -> list:
+    """Summarize a batch of chunks, falling back to per-chunk requests if the batch is rejected."""
+    summaries = await hf_summarize_batch(chunks)
+    if summaries is None:
+        tasks = [hf_summarize(chunk) for chunk in chunks]
+        summaries = await asyncio.gather(*tasks)
+    return summaries
+
+# -----------------------------------------------------------
+# HELPER FUNCTIONS
+# -----------------------------------------------------------
+
+CHUNK_TOKENS = 900  # Chunk size in model tokens; the encoder caps at 1024
+CHUNK_CHARS = 1000  # Chunk size in characters, used when the tokenizer can't be loaded
+CHUNK_OVERLAP = 0  # Summaries are concatenated, so overlapping text would be summarized twice
+
+# Same BPE vocabulary as HF_MODEL, published as the tokenizer.json the tokenizers package loads
+TOKENIZER_MODEL = "facebook/bart-large-cnn"
+
+
+TOKENIZER_RETRY_SECONDS = 60  # Wait this long after a failed load before trying again
+
+# Only a successful load is kept; a failure is retried after TOKENIZER_RETRY_SECONDS
+loaded_tokenizer = None
+tokenizer_failed_at = None
+tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer():
+    """
+    Fast (Rust) tokenizer for the summarization model, loaded from the Hub on first use.
+    Returns None while it is unavailable (failed recently, or another thread is
+    loading it); chunking then falls back to characters.
+    """
+    global loaded_tokenizer, tokenizer_failed_at
+    if loaded_tokenizer is not None:
+        return loaded_tokenizer
+    # One loader at a time; other callers don't wait for a download
+    if not tokenizer_lock.acquire(blocking=False):
+        return None
+    try:
+        if loaded_tokenizer is not None:
+            return loaded_tokenizer
+        if tokenizer_failed_at is not None and time.monotonic() - tokenizer_failed_at < TOKENIZER_RETRY_SECONDS:
+            return None
+
+        from tokenizers import Tokenizer  # Only pay for the import when first needed
+
+        try:
+            tokenizer = Tokenizer.from_pretrained(TOKENIZER_MODEL)
+        except Exception as e:
+            tokenizer_failed_at = time.monotonic()
+            logger.warning(
+                "Tokenizer unavailable, chunking by characters (retrying in %ss): %s",
+                TOKENIZER_RETRY_SECONDS, e,
+            )
+            return None
+        tokenizer.no_truncation()
+        loaded_tokenizer = tokenizer
+        return tokenizer
+    finally:
+        tokenizer_lock.release()
+
+
+def token_starts(text: str) -> Optional[list]:
+    """Start offset in text of each model token from a single tokenizer pass, or None without a tokenizer."""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return None
+    return [start for start, _ in tokenizer.encode(text, add_special_tokens=False).offsets]
+
+
+PARALLEL_PAGE_THRESHOLD = 16  # PDFs with more pages than this are extracted across processes
+PDF_WORKERS = os.cpu_count() or 1
+
+# Page extraction pool shared by all requests; created by open_resources() and
+# replaced (under pool_lock) if a worker dies
+executor = None
+pool_lock = threading.Lock()
+
+# PDFium is not thread-safe: every in-process PDFium call (extraction runs via
+# asyncio.to_thread) must hold this lock. It serializes extraction across requests,
+# so it's only used without a pool; pool workers are separate processes.
+PDFIUM_LOCK = threading.Lock()
+
+
+def extract_pages(pdf, start: int, stop: int):
+    """Extract the text of pages [start, stop) from an open PDF document."""
+    parts = []
+    get_page = pdf.get_page  # Bound once; skips per-page attribute lookup and __getitem__ dispatch
+    for index in range(start, stop):
+        page = get_page(index)
+        textpage = page.get_textpage()
+        try:
+            parts.append(textpage.get_text_range())
+        finally:
+            textpage.close()
+            page.close()
+    return parts
+
+
+def extract_pages_from_file(file_path: str, start: int, stop: int):
+    """Extract the text of pages [start, stop) from a PDF file (process pool worker)."""
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        return extract_pages(pdf, start, stop)
+    finally:
+        pdf.close()
+
+
+def read_small_pdf_from_file(file_path: str):
+    """
+    Process pool worker: return (page count, page texts) for a PDF file.
+    Page texts are None when the PDF is large enough to be split across workers.
+    """
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        n = len(pdf)
+        if n <= PARALLEL_PAGE_THRESHOLD:
+            return n, extract_pages(pdf, 0, n)
+        return n, None
+    finally:
+        pdf.close()
+
+
+def read_pdf_in_pool(pool, file_path: str) -> str:
+    """Extract all text from a PDF file in the process pool, splitting large PDFs across workers."""
+    n, parts = pool.submit(read_small_pdf_from_file, file_path).result()
+    if parts is None:
+        # One contiguous page range per worker, so each process opens the file only once
+        step = -(-n // min(PDF_WORKERS, n))
+        starts = range(0, n, step)
+        stops = [min(start + step, n) for start in starts]
+        results = pool.map(extract_pages_from_file, repeat(file_path), starts, stops)
+        parts = [text for part in results for text in part]
+    return "\n".join(parts)
+
+
+def new_executor() -> ProcessPoolExecutor:
+    """Create a page extraction pool."""
+    # spawn: workers start from a clean interpreter instead of forking a multithreaded server
+    return ProcessPoolExecutor(
+        max_workers=PDF_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def replace_broken_pool(broken: ProcessPoolExecutor):
+    """Swap a fresh pool in for one whose worker died, unless another thread already has."""
+    global executor
+    with pool_lock:
+        if executor is broken:
+            executor = new_executor()
+    broken.shutdown(wait=False)
+
+
+def read_pdf_from_file(file_path: str) -> str:
+    """
+    Extract all text from a PDF file in the shared process pool, so concurrent
+    requests extract in parallel. Without a pool (open_resources() not called),
+    extraction runs in-process under PDFIUM_LOCK, one PDF at a time.
+    If a pool worker dies (e.g. PDFium crashed), the pool is rebuilt and extraction
+    retried once; a second failure raises BrokenProcessPool.
+    """
+    pool = executor
+    if pool is None:
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                return "\n".join(extract_pages(pdf, 0, len(pdf)))
+            finally:
+                pdf.close()
+    try:
+        return read_pdf_in_pool(pool, file_path)
+    except BrokenProcessPool:
+        logger.warning("PDF extraction pool broke; restarting it and retrying %s", file_path)
+        replace_broken_pool(pool)
+
+    pool = executor
+    if pool is None:  # Shut down meanwhile
+        raise BrokenProcessPool("PDF extraction pool is closed")
+    try:
+        return read_pdf_in_pool(pool, file_path)
+    except BrokenProcessPool:
+        replace_broken_pool(pool)
+        raise
+
+
+# Split points: whitespace after a sentence end, or any line break (\n or \r\n)
+SEP_RE = re.compile(r"(?<=[.!?])\s+|\s*\r?\n\s*")
+
+
+WORD_RE = re.compile(r"\S+")
+
+
+def span_measure(starts=None):
+    """
+    Build measure(start, end): the length of text[start:end] in characters,
+    or in tokens when given token start offsets (see token_starts).
+    """
+    if starts is None:
+        return lambda start, end: end - start
+    return lambda start, end: bisect_left(starts, end) - bisect_left(starts, start)
+
+
+def longest_prefix(start: int, end: int, max_length: int, measure) -> int:
+    """End of the longest prefix of span [start, end) within max_length (at least one character)."""
+    low, high = start + 1, end
+    while low < high:
+        mid = (low + high + 1) // 2
+        if measure(start, mid) <= max_length:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def split_pieces(text: str, max_length: int, measure):
+    """
+    Split text into sentence spans, breaking any sentence longer than max_length
+    into words (and any word longer than max_length into slices).
+    """
+    pieces = []
+    bounds = [0]
+    for match in SEP_RE.finditer(text):
+        bounds.extend(match.span())
+    bounds.append(len(text))
+    for start, end in zip(bounds[::2], bounds[1::2]):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            continue
+        if measure(start, end) <= max_length:
+            pieces.append((start, end))
+            continue
+        for word in WORD_RE.finditer(text, start, end):
+            word_start, word_end = word.span()
+            while measure(word_start, word_end) > max_length:
+                cut = longest_prefix(word_start, word_end, max_length, measure)
+                pieces.append((word_start, cut))
+                word_start = cut
+            pieces.append((word_start, word_end))
+    return pieces
+
+
+def overlap_start(text: str, start: int, end: int, overlap: int, measure):
+    """Start of the longest run of whole trailing words of text[start:end] within overlap, or None."""
+    best = None
+    if overlap > 0:
+        for word in reversed(list(WORD_RE.finditer(text, start, end))):
+            if measure(word.start(), end) > overlap:
+                break
+            best = word.start()
+    return best
+
+
+def chunk_text(text: str, max_length: int = 1000, overlap: int = 100, starts=None):
+    """
+    Split text into overlapping chunks on sentence/word boundaries.
+    - max_length: max length per chunk, in characters (or tokens, with starts)
+    - overlap: approx length (whole words) carried over from the previous chunk
+    - starts: token start offsets from token_starts(text), to measure in tokens
+    """
+    measure = span_measure(starts)
+    chunks = []
+    chunk_start = chunk_end = None
+    for start, end in split_pieces(text, max_length, measure):
+        if chunk_start is None:
+            chunk_start = start
+        elif measure(chunk_start, end) > max_length:
+            chunks.append(text[chunk_start:chunk_end])
+            tail = overlap_start(text, chunk_start, chunk_end, overlap, measure)
+            chunk_start = tail if tail is not None and measure(tail, end) <= max_length else start
+        chunk_end = end
+    if chunk_start is not None:
+        chunks.append(text[chunk_start:chunk_end])
+    return chunks
+
+
+def chunk_by_tokens(text: str):
+    """Chunk text for the summarization model, tokenizing it only once."""
+    starts = token_starts(text)
+    if starts is None:
+        return chunk_text(text, CHUNK_CHARS, CHUNK_OVERLAP)
+    return chunk_text(text, CHUNK_TOKENS, CHUNK_OVERLAP, starts)
+
+
+async def summarize_long_text(text: str) -> str:
+    """
+    Summarize long text in chunks via Hugging Face API.
+    Cached chunks are reused; the rest are sent in concurrent batches of HF_BATCH_SIZE.
+    Raises httpx.HTTPError if the API fails, including in the per-chunk fallback.
+    """
+    # Tokenizing is CPU-bound; keep it off the event loop
+    chunks = await asyncio.to_thread(chunk_by_tokens, text)
+    keys = [chunk_key(chunk) for chunk in chunks]
+
+    summaries = {}
+    pending = {}  # Unique uncached chunks, by key
+    for key, chunk in zip(keys, chunks):
+        if key in summary_cache:
+            summaries[key] = summary_cache[key]
+        else:
+            pending[key] = chunk
+
+    if pending:
+        todo = list(pending.values())
+        batches = [todo[i:i + HF_BATCH_SIZE] for i in range(0, len(todo), HF_BATCH_SIZE)]
+        results = await asyncio.gather(*(summarize_batch(batch) for batch in batches))
+        summaries.update(zip(pending, (summary for batch in results for summary in batch)))
+
+    return " ".join(summaries[key] for key in keys)
+
+# -----------------------------------------------------------
+# STARTUP / SHUTDOWN
+# -----------------------------------------------------------
+
+def open_resources():
+    """Create the shared HTTP client, request semaphore and page extraction pool. Call at app startup."""
+    global client, hf_semaphore, executor
+    hf_semaphore = asyncio.Semaphore(HF_CONCURRENCY_LIMIT)
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(60.0),
+        http2=True,
+        headers=HEADERS,
+        limits=httpx.Limits(max_connections=8),
+    )
+    with pool_lock:
+        executor = new_executor()
+
+
+async def close_resources():
+    """Close the shared HTTP client and page extraction pool. Call at app shutdown."""
+    global client, hf_semaphore, executor
+    if client is not None:
+        await client.aclose()
+        client = None
+        hf_semaphore = None
+    with pool_lock:
+        pool, executor = executor, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import tempfile
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+import pdf_utils
+
+
+async def no_warm_up():
+    pass
+
+
+def test_app_can_start_twice(monkeypatch):
+    # Keep startup offline: no model warm-up request, no tokenizer download
+    monkeypatch.setattr(api, "warm_up_model", no_warm_up)
+    monkeypatch.setattr(api, "get_tokenizer", lambda: None)
+    assert pdf_utils.client is None  # Nothing is created at import time
+    for _ in range(2):
+        with TestClient(api.app) as test_client:
+            assert test_client.get("/").json()["status"] == "ok"
+            assert not pdf_utils.client.is_closed
+        assert pdf_utils.client is None
+
+
+def test_shutdown_cancels_warm_up_before_closing_client(monkeypatch):
+    events = []
+
+    async def slow_warm_up():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            events.append(("cancelled", pdf_utils.client.is_closed))
+            raise
+
+    monkeypatch.setattr(api, "warm_up_model", slow_warm_up)
+    monkeypatch.setattr(api, "get_tokenizer", lambda: None)
+    with TestClient(api.app) as test_client:
+        test_client.get("/")
+    assert events == [("cancelled", False)]
+
+
+@pytest.fixture
+def app_client(monkeypatch):
+    """TestClient for the app, started offline (no warm-up, no tokenizer download)."""
+    monkeypatch.setattr(api, "warm_up_model", no_warm_up)
+    monkeypatch.setattr(api, "get_tokenizer", lambda: None)
+    monkeypatch.setattr(pdf_utils, "get_tokenizer", lambda: None)
+    with TestClient(api.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def temp_paths(monkeypatch):
+    """Paths of the temp files created for uploads."""
+    paths = []
+    named_temporary_file = tempfile.NamedTemporaryFile
+
+    def recording(*args, **kwargs):
+        tmp = named_temporary_file(*args, **kwargs)
+        paths.append(tmp.name)
+        return tmp
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", recording)
+    return paths
+
+
+def upload(path):
+    return {"file": ("doc.pdf", path.read_bytes(), "application/pdf")}
+
+
+def test_read_pdf_removes_temp_file(app_client, make_pdf, temp_paths):
+    response = app_client.post("/read-pdf", files=upload(make_pdf(["Hello", "World"])))
+    assert response.json() == {"text": "Hello\nWorld"}
+    assert temp_paths and not any(os.path.exists(path) for path in temp_paths)
+
+
+def test_read_pdf_invalid_file_removes_temp_file(app_client, tmp_path, temp_paths):
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    response = app_client.post("/read-pdf", files=upload(bad))
+    assert response.status_code == 500
+    assert "error" in response.json()
+    assert temp_paths and not any(os.path.exists(path) for path in temp_paths)
+
+
+def test_large_responses_are_gzipped(app_client, make_pdf):
+    pages = [f"Page {i} " + "lorem ipsum " * 20 for i in range(10)]
+    response = app_client.post("/read-pdf", files=upload(make_pdf(pages)))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["text"].startswith("Page 0 ")
+    assert "content-encoding" not in app_client.get("/").headers  # Small responses are left alone
+
+
+def test_summarize_pdf_without_text(app_client, make_pdf):
+    response = app_client.post("/summarize-pdf", files=upload(make_pdf(["", ""])))
+    assert response.status_code == 400
+
+
+def test_summarize_pdf_invalid_file(app_client, tmp_path):
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    assert app_client.post("/summarize-pdf", files=upload(bad)).status_code == 500
+
+
+def test_summarize_pdf_hf_error(app_client, make_pdf, monkeypatch):
+    async def unreachable(payload, **kwargs):
+        raise httpx.ConnectError("Hugging Face unreachable")
+
+    monkeypatch.setattr(pdf_utils, "hf_post", unreachable)
+    response = app_client.post("/summarize-pdf", files=upload(make_pdf(["Some text to summarize."])))
+    assert response.status_code == 502
+    assert "Hugging Face unreachable" in response.json()["error"]
+
+
+def test_summarize_pdf(app_client, make_pdf, monkeypatch):
+    async def summarize(text):
+        return f"summary of {text}"
+
+    monkeypatch.setattr(api, "summarize_long_text", summarize)
+    response = app_client.post("/summarize-pdf", files=upload(make_pdf(["Quarterly results."])))
+    assert response.json() == {"summary": "summary of Quarterly results."}
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import re
+from concurrent.futures.process import BrokenProcessPool
+
+import httpx
+import pytest
+
+import pdf_utils
+from pdf_utils import SEP_RE, chunk_by_tokens, chunk_text
+
+TEXT = (
+    "The quarterly report covers revenue, costs and outlook. Revenue grew by ten percent.\r\n"
+    "Costs were flat compared with last year!\n\n"
+    "Is the outlook positive? Management expects further growth in every region "
+    "and plans to expand the sales team over the coming quarters."
+)
+
+
+def test_line_breaks_are_split_points():
+    assert SEP_RE.split("line one\r\nline two\r\nthree.") == ["line one", "line two", "three."]
+    assert SEP_RE.split("first.  second\n\nthird") == ["first.", "second", "third"]
+
+
+def test_empty_text():
+    assert chunk_text("") == []
+    assert chunk_text("   \n ") == []
+
+
+def test_chunks_respect_max_length():
+    for max_length in (20, 35, 60, 200):
+        chunks = chunk_text(TEXT, max_length=max_length, overlap=10)
+        assert chunks
+        assert all(len(chunk) <= max_length for chunk in chunks)
+
+
+def test_without_overlap_every_word_appears_once():
+    chunks = chunk_text(TEXT, max_length=50, overlap=0)
+    assert " ".join(chunks).split() == TEXT.split()
+
+
+def test_overlap_carries_whole_words():
+    chunks = chunk_text(TEXT, max_length=60, overlap=20)
+    words = set(TEXT.split())
+    carried = 0
+    for previous, current in zip(chunks, chunks[1:]):
+        assert set(current.split()) <= words  # No word is cut to make room for the overlap
+        prev_words = previous.split()
+        for n in range(len(prev_words), 0, -1):
+            tail = prev_words[-n:]
+            if current.split()[:n] == tail:
+                assert len(" ".join(tail)) <= 20
+                carried += 1
+                break
+    assert carried
+
+
+def test_long_word_is_sliced():
+    word = "x" * 45
+    chunks = chunk_text(f"short. {word} end.", max_length=20, overlap=0)
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert "".join("".join(chunks).split()) == f"short.{word}end."
+
+
+def test_chunks_respect_token_budget():
+    # One "token" per word, so lengths are measured in words
+    starts = [word.start() for word in re.finditer(r"\S+", TEXT)]
+    chunks = chunk_text(TEXT, max_length=8, overlap=0, starts=starts)
+    assert all(len(chunk.split()) <= 8 for chunk in chunks)
+    assert " ".join(chunks).split() == TEXT.split()
+
+
+def test_chunk_by_tokens_falls_back_to_characters(monkeypatch):
+    monkeypatch.setattr(pdf_utils, "get_tokenizer", lambda: None)
+    text = TEXT * 20
+    assert chunk_by_tokens(text) == chunk_text(text, pdf_utils.CHUNK_CHARS, pdf_utils.CHUNK_OVERLAP)
+
+
+@pytest.fixture
+def hf_api(monkeypatch):
+    """
+    Route HF API calls to a handler: hf_api.handler = fn(request) -> httpx.Response.
+    Chunks by characters, with no retry delays and an empty cache.
+    """
+    class Api:
+        handler = None
+        requests = []
+
+    Api.requests = []
+
+    def dispatch(request):
+        Api.requests.append(json.loads(request.content)["inputs"])
+        return Api.handler(request)
+
+    monkeypatch.setattr(pdf_utils, "client", httpx.AsyncClient(transport=httpx.MockTransport(dispatch)))
+    monkeypatch.setattr(pdf_utils, "hf_semaphore", asyncio.Semaphore(pdf_utils.HF_CONCURRENCY_LIMIT))
+    monkeypatch.setattr(pdf_utils, "HF_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(pdf_utils, "get_tokenizer", lambda: None)
+    pdf_utils.summary_cache.clear()
+    yield Api
+    pdf_utils.summary_cache.clear()
+
+
+def paragraph(name: str) -> str:
+    """A sentence long enough (~600 chars) that character chunking gives it a chunk of its own."""
+    return f"{name} " + "word " * 118 + "end."
+
+
+def test_per_chunk_fallback_errors_raise(hf_api):
+    def handler(request):
+        if isinstance(json.loads(request.content)["inputs"], list):
+            return httpx.Response(413)  # Batch rejected
+        return httpx.Response(429)
+
+    hf_api.handler = handler
+    with pytest.raises(httpx.HTTPError):
+        asyncio.run(pdf_utils.summarize_long_text(paragraph("alpha")))
+
+
+def test_per_chunk_fallback_non_json_raises(hf_api):
+    hf_api.handler = lambda request: httpx.Response(200, text="<html>busy</html>")
+    with pytest.raises(httpx.HTTPError):
+        asyncio.run(pdf_utils.summarize_long_text(paragraph("alpha")))
+
+
+@pytest.fixture
+def tokenizer_loads(monkeypatch):
+    """Fake Hub loads: tokenizer_loads.results is consumed one per load (an exception means a failed load)."""
+    import tokenizers
+
+    class Loads:
+        results = []
+        count = 0
+
+    def from_pretrained(name):
+        Loads.count += 1
+        result = Loads.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    class FakeTokenizer:
+        def no_truncation(self):
+            pass
+
+    Loads.tokenizer = FakeTokenizer()
+    monkeypatch.setattr(tokenizers.Tokenizer, "from_pretrained", staticmethod(from_pretrained))
+    monkeypatch.setattr(pdf_utils, "loaded_tokenizer", None)
+    monkeypatch.setattr(pdf_utils, "tokenizer_failed_at", None)
+    return Loads
+
+
+def test_tokenizer_failure_is_retried_after_cooldown(tokenizer_loads, monkeypatch):
+    tokenizer_loads.results = [OSError("hub down"), tokenizer_loads.tokenizer]
+    assert pdf_utils.get_tokenizer() is None
+    assert pdf_utils.get_tokenizer() is None  # Still cooling down: no second download
+    assert tokenizer_loads.count == 1
+
+    cooled_down = pdf_utils.tokenizer_failed_at - pdf_utils.TOKENIZER_RETRY_SECONDS
+    monkeypatch.setattr(pdf_utils, "tokenizer_failed_at", cooled_down)
+    assert pdf_utils.get_tokenizer() is tokenizer_loads.tokenizer
+    assert pdf_utils.get_tokenizer() is tokenizer_loads.tokenizer  # Success is kept
+    assert tokenizer_loads.count == 2
+
+
+def test_tokenizer_is_not_loaded_twice_concurrently(tokenizer_loads):
+    tokenizer_loads.results = [tokenizer_loads.tokenizer]
+    with pdf_utils.tokenizer_lock:  # Another thread is mid-download
+        assert pdf_utils.get_tokenizer() is None
+    assert tokenizer_loads.count == 0
+    assert pdf_utils.get_tokenizer() is tokenizer_loads.tokenizer
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """A real page extraction pool for the test."""
+    executor = pdf_utils.new_executor()
+    monkeypatch.setattr(pdf_utils, "executor", executor)
+    yield executor
+    pdf_utils.executor.shutdown()
+    executor.shutdown()
+
+
+def page_texts(n):
+    return [f"Page {i} of the report" for i in range(1, n + 1)]
+
+
+def test_read_pdf_in_process(make_pdf):
+    path = make_pdf(["First page", "", "Third page"])
+    assert pdf_utils.read_pdf_from_file(str(path)) == "First page\n\nThird page"
+
+
+@pytest.mark.parametrize("n", [3, pdf_utils.PARALLEL_PAGE_THRESHOLD + 9])
+def test_read_pdf_in_pool(make_pdf, pool, n):
+    path = make_pdf(page_texts(n))
+    assert pdf_utils.read_pdf_from_file(str(path)) == "\n".join(page_texts(n))
+
+
+def test_read_pdf_recovers_from_broken_pool(make_pdf, pool):
+    n = pdf_utils.PARALLEL_PAGE_THRESHOLD + 9
+    path = make_pdf(page_texts(n))
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()  # Kill a worker, as a PDFium crash would
+
+    assert pdf_utils.read_pdf_from_file(str(path)) == "\n".join(page_texts(n))
+    assert pdf_utils.executor is not pool
+    assert pdf_utils.read_pdf_from_file(str(path)).startswith("Page 1 ")
+
+
+def fake_summaries(request):
+    """Fake model: one summary per input, named after the input's first word."""
+    inputs = json.loads(request.content)["inputs"]
+    if isinstance(inputs, str):
+        return httpx.Response(200, json=[{"summary_text": f"S({inputs.split()[0]})"}])
+    return httpx.Response(200, json=[{"summary_text": f"S({text.split()[0]})"} for text in inputs])
+
+
+def test_paragraphs_are_separate_chunks(hf_api):
+    text = " ".join(paragraph(name) for name in ("p1", "p2"))
+    assert pdf_utils.chunk_by_tokens(text) == [paragraph("p1"), paragraph("p2")]
+
+
+def test_duplicate_chunks_are_summarized_once(hf_api):
+    hf_api.handler = fake_summaries
+    text = " ".join(paragraph(name) for name in ("p1", "p2", "p1"))
+    assert asyncio.run(pdf_utils.summarize_long_text(text)) == "S(p1) S(p2) S(p1)"
+    assert hf_api.requests == [[paragraph("p1"), paragraph("p2")]]
+
+
+def test_repeat_call_is_served_from_cache(hf_api):
+    hf_api.handler = fake_summaries
+    text = " ".join(paragraph(name) for name in ("p1", "p2"))
+    first = asyncio.run(pdf_utils.summarize_long_text(text))
+    assert asyncio.run(pdf_utils.summarize_long_text(text)) == first == "S(p1) S(p2)"
+    assert len(hf_api.requests) == 1
+
+
+def test_rejected_batch_falls_back_without_reordering(hf_api):
+    names = [f"p{i}" for i in range(2 * pdf_utils.HF_BATCH_SIZE + 3)]
+
+    def handler(request):
+        inputs = json.loads(request.content)["inputs"]
+        if isinstance(inputs, list) and paragraph("p9") in inputs:
+            return httpx.Response(413)  # Only the second batch is rejected
+        return fake_summaries(request)
+
+    hf_api.handler = handler
+    text = " ".join(paragraph(name) for name in names)
+    assert asyncio.run(pdf_utils.summarize_long_text(text)) == " ".join(f"S({name})" for name in names)
+
+    batches = [inputs for inputs in hf_api.requests if isinstance(inputs, list)]
+    singles = [inputs for inputs in hf_api.requests if isinstance(inputs, str)]
+    assert [len(batch) for batch in batches] == [pdf_utils.HF_BATCH_SIZE, pdf_utils.HF_BATCH_SIZE, 3]
+    assert sorted(singles) == sorted(batches[1])
+
+
+def test_model_loading_503_is_retried(hf_api):
+    responses = [httpx.Response(503), httpx.Response(503)]
+    hf_api.handler = lambda request: responses.pop(0) if responses else fake_summaries(request)
+    assert asyncio.run(pdf_utils.summarize_long_text(paragraph("p1"))) == "S(p1)"
+    assert len(hf_api.requests) == 3
+
+
+def test_503_gives_up_after_retries(hf_api):
+    hf_api.handler = lambda request: httpx.Response(503)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(pdf_utils.summarize_long_text(paragraph("p1")))
+    assert len(hf_api.requests) == pdf_utils.HF_RETRIES + 1